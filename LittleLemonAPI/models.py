@@ -4,6 +4,7 @@ from django.contrib.auth.models import User
 class Category(models.Model):
     title = models.CharField(max_length=255)
     slug = models.SlugField()
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.title
@@ -14,6 +15,12 @@ class MenuItem(models.Model):
     featured = models.BooleanField(db_index=False)
     inventory = models.IntegerField()
     category = models.ForeignKey(Category, on_delete=models.PROTECT)
+    updated_at = models.DateTimeField(auto_now=True)
+    class Meta:
+        indexes = [
+            models.Index(fields=['title']),
+            models.Index(fields=['price']),
+        ]
 
     def __str__(self):
         return self.title
@@ -32,7 +39,13 @@ class Order(models.Model):
     delivery_crew = models.ForeignKey(User, related_name='delivery_crew', on_delete=models.SET_NULL, null=True, blank=True)
     status = models.BooleanField(db_index=True, default=0)
     total = models.DecimalField(max_digits=6, decimal_places=2)
-    date = models.DateField(db_index=True)
+    date = models.DateField(db_index=True, null=True, blank=True)
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'date']),
+            models.Index(fields=['delivery_crew', 'date']),
+            models.Index(fields=['user', 'date']),
+        ]
 
 class OrderItem(models.Model):
     order = models.ForeignKey(Order, on_delete=models.CASCADE)
@@ -1,20 +1,31 @@
 from rest_framework.permissions import BasePermission
 
+# Utility function
+# Returns the set of group names for a user, cached on the user object so
+# repeated permission checks within one request share a single query.
+def get_user_groups(user):
+    if not hasattr(user, '_cached_group_names'):
+        if user and user.is_authenticated:
+            user._cached_group_names = set(user.groups.values_list('name', flat=True))
+        else:
+            user._cached_group_names = set()
+    return user._cached_group_names
+
 class IsManager(BasePermission):
     def has_permission(self, request, view):
-        return request.user.groups.filter(name='Manager').exists()
+        return 'Manager' in get_user_groups(request.user)
 
 class IsDeliveryCrew(BasePermission):
     def has_permission(self, request, view):
-        return request.user.groups.filter(name='Delivery crew').exists()
+        return 'Delivery crew' in get_user_groups(request.user)
 
 class IsCustomer(BasePermission):
     def has_permission(self, request, view):
-        # Assuming customers are users who do not belong to any specific group
-        return not request.user.groups.exists()
+        # Customers are users in neither the Manager nor the Delivery crew group
+        return not (get_user_groups(request.user) & {'Manager', 'Delivery crew'})
 class IsAuthenticated(BasePermission):
     def has_permission(self, request, view):
         return request.user and request.user.is_authenticated
 class IsAdminOrManager(BasePermission):
     def has_permission(self, request, view):
-        return (request.user and request.user.is_staff) or request.user.groups.filter(name="Manager").exists()
\ No newline at end of file
+        return (request.user and request.user.is_staff) or 'Manager' in get_user_groups(request.user)
\ No newline at end of file
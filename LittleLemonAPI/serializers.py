@@ -5,30 +5,49 @@ from django.contrib.auth.models import User
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = Category
-        fields = '__all__'
+        exclude = ['updated_at']
 
 class MenuItemSerializer(serializers.ModelSerializer):
     class Meta:
         model = MenuItem
-        fields = '__all__'
+        exclude = ['updated_at']
 
 class CartSerializer(serializers.ModelSerializer):
     class Meta:
         model = Cart
-        fields = '__all__'
+        fields = ['id', 'quantity', 'unit_price', 'price', 'user', 'menuitem']
+        read_only_fields = fields
 
 class OrderItemSerializer(serializers.ModelSerializer):
     class Meta:
         model = OrderItem
-        fields = '__all__'
+        fields = ['id', 'quantity', 'unit_price', 'price', 'order', 'menuitem']
+        read_only_fields = fields
+
+# Plain dict version of OrderItemSerializer for nesting inside orders,
+# avoids building a serializer (and deep-copying its fields) per order.
+def serialize_order_item(item):
+    return {
+        'id': item.id,
+        'quantity': item.quantity,
+        'unit_price': str(item.unit_price),
+        'price': str(item.price),
+        'order': item.order_id,
+        'menuitem': item.menuitem_id,
+    }
 
 class OrderSerializer(serializers.ModelSerializer):
-    orderitem_set = OrderItemSerializer(many=True, read_only=True)
     class Meta:
         model = Order
-        fields = ['id', 'user', 'delivery_crew', 'status', 'total', 'date', 'orderitem_set']
+        fields = ['id', 'user', 'delivery_crew', 'status', 'total', 'date']
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        data['orderitem_set'] = [serialize_order_item(item) for item in instance.orderitem_set.all()]
+        return data
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
-        fields = ['id', 'username', 'email', 'first_name', 'last_name']
\ No newline at end of file
+        fields = ['id', 'username', 'email', 'first_name', 'last_name']
+        read_only_fields = fields
\ No newline at end of file
@@ -1,3 +1,243 @@
+from decimal import Decimal
+from unittest import mock
+from django.contrib.auth.models import Group, User
+from django.core.cache import cache
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from .models import Cart, Category, MenuItem, Order, OrderItem
+from .serializers import OrderItemSerializer, serialize_order_item
+from .views import _group_id
 
-# Create your tests here.
+class OrderItemSerializationTest(TestCase):
+    def test_serialize_order_item_matches_order_item_serializer(self):
+        user = User.objects.create_user('customer')
+        category = Category.objects.create(title='Mains', slug='mains')
+        menuitem = MenuItem.objects.create(title='Pasta', price=Decimal('7.50'), featured=False, inventory=10, category=category)
+        order = Order.objects.create(user=user, total=Decimal('15.00'), date=timezone.now().date())
+        item = OrderItem.objects.create(order=order, menuitem=menuitem, quantity=2, unit_price=Decimal('7.50'), price=Decimal('15.00'))
+        item.refresh_from_db()
+
+        self.assertEqual(serialize_order_item(item), dict(OrderItemSerializer(item).data))
+
+class GroupMembershipTest(TestCase):
+    def setUp(self):
+        # Throttle counters and cached group ids must not leak between tests
+        cache.clear()
+        _group_id.cache_clear()
+        self.manager_group = Group.objects.create(name='Manager')
+        self.delivery_group = Group.objects.create(name='Delivery crew')
+        self.admin = User.objects.create_user('admin', is_staff=True)
+        self.customer = User.objects.create_user('customer')
+        self.other = User.objects.create_user('other')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_group_routes(self):
+        for slug, group_name, group in [
+            ('manager', 'Manager', self.manager_group),
+            ('delivery-crew', 'Delivery crew', self.delivery_group),
+        ]:
+            with self.subTest(slug=slug):
+                url = '/api/groups/%s/users' % slug
+                response = self.client.post(url, {'user_id': self.customer.id}, format='json')
+                self.assertEqual(response.status_code, 201)
+                self.assertEqual(response.data, {'message': 'User added to %s group' % group_name})
+
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.data, [{'id': self.customer.id, 'username': 'customer'}])
+
+                response = self.client.delete('%s/%d' % (url, self.customer.id))
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.data, {'message': 'User removed from %s group' % group_name})
+                self.assertFalse(group.user_set.exists())
+
+    def test_unknown_user(self):
+        response = self.client.post('/api/groups/manager/users', {'user_id': 999}, format='json')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.data, {'error': 'User not found'})
+        response = self.client.delete('/api/groups/delivery-crew/users/999')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.data, {'error': 'User not found'})
+
+    def test_unknown_group_slug(self):
+        for method, url in [('get', '/api/groups/foo/users'), ('delete', '/api/groups/foo/users/%d' % self.customer.id)]:
+            with self.subTest(method=method):
+                self.assertEqual(getattr(self.client, method)(url).status_code, 404)
+
+    def test_unknown_group_slug_checks_permissions_first(self):
+        client = APIClient()
+        client.force_authenticate(self.customer)
+        self.assertEqual(client.get('/api/groups/foo/users').status_code, 403)
+        self.assertEqual(client.get('/api/groups/manager/users').status_code, 403)
+
+    def test_bulk_add_users(self):
+        response = self.client.post('/api/groups/delivery-crew/users', {'user_ids': [self.customer.id, self.other.id, 999, self.customer.id, 999]}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data, {'message': 'Users added to Delivery crew group', 'skipped': [999]})
+        self.assertEqual(set(self.delivery_group.user_set.values_list('id', flat=True)), {self.customer.id, self.other.id})
+
+    def test_bulk_add_existing_member_is_ignored(self):
+        self.customer.groups.add(self.manager_group)
+        response = self.client.post('/api/groups/manager/users', {'user_ids': [self.customer.id]}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.manager_group.user_set.count(), 1)
+
+    def test_bulk_add_unknown_users(self):
+        response = self.client.post('/api/groups/manager/users', {'user_ids': [998, 999, 998]}, format='json')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.data['skipped'], [998, 999])
+        self.assertFalse(self.manager_group.user_set.exists())
+
+    def test_bulk_add_rejects_invalid_ids(self):
+        for user_ids in [self.customer.id, [], ['abc'], [str(self.customer.id)], [True], [None]]:
+            with self.subTest(user_ids=user_ids):
+                response = self.client.post('/api/groups/manager/users', {'user_ids': user_ids}, format='json')
+                self.assertEqual(response.status_code, 400)
+        self.assertFalse(self.manager_group.user_set.exists())
+
+class OrderPermissionTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        _group_id.cache_clear()
+        self.manager = User.objects.create_user('manager')
+        self.manager.groups.add(Group.objects.create(name='Manager'))
+        self.delivery_crew = User.objects.create_user('delivery')
+        self.delivery_crew.groups.add(Group.objects.create(name='Delivery crew'))
+        self.customer = User.objects.create_user('customer')
+        self.order = Order.objects.create(user=self.customer, total=Decimal('10.00'), date=timezone.now().date())
+
+    def request(self, user, method, url, data=None):
+        # Clear the throttle counters so every call in a test is evaluated
+        cache.clear()
+        client = APIClient()
+        client.force_authenticate(user)
+        return getattr(client, method)(url, data, format='json')
+
+    def test_permissions_by_method_and_role(self):
+        detail_url = '/api/orders/%d/' % self.order.id
+        assigned_order = Order.objects.create(user=self.customer, delivery_crew=self.delivery_crew, total=Decimal('5.00'), date=timezone.now().date())
+        assigned_url = '/api/orders/%d/' % assigned_order.id
+        put_data = {'user': self.customer.id, 'status': False, 'total': '10.00', 'date': str(self.order.date)}
+        # POST with an empty cart returns 400 once the permission check passes
+        expected = [
+            (self.manager, 'get', '/api/orders/', None, 200),
+            (self.manager, 'post', '/api/orders/', {}, 400),
+            (self.manager, 'put', detail_url, put_data, 200),
+            (self.manager, 'patch', detail_url, {'status': 1}, 200),
+            (self.delivery_crew, 'get', '/api/orders/', None, 200),
+            (self.delivery_crew, 'post', '/api/orders/', {}, 403),
+            (self.delivery_crew, 'put', detail_url, put_data, 403),
+            (self.delivery_crew, 'patch', detail_url, {'status': 0}, 404),
+            (self.delivery_crew, 'patch', assigned_url, {'status': 1}, 200),
+            (self.delivery_crew, 'delete', detail_url, None, 403),
+            (self.customer, 'get', '/api/orders/', None, 200),
+            (self.customer, 'post', '/api/orders/', {}, 400),
+            (self.customer, 'put', detail_url, put_data, 403),
+            (self.customer, 'patch', detail_url, {'status': 1}, 403),
+            (self.customer, 'delete', detail_url, None, 403),
+            (self.manager, 'delete', detail_url, None, 204),
+        ]
+        for user, method, url, data, status_code in expected:
+            with self.subTest(user=user.username, method=method):
+                response = self.request(user, method, url, data)
+                self.assertEqual(response.status_code, status_code)
+
+        # Anonymous users have no groups, so they must not pass as customers
+        for method, url, data in [
+            ('get', '/api/orders/', None),
+            ('post', '/api/orders/', {}),
+            ('put', detail_url, put_data),
+            ('patch', detail_url, {'status': 1}),
+            ('delete', detail_url, None),
+        ]:
+            with self.subTest(user='anonymous', method=method):
+                response = self.request(None, method, url, data)
+                self.assertIn(response.status_code, (401, 403))
+
+    def test_orders_listed_by_role(self):
+        other_order = Order.objects.create(user=self.manager, delivery_crew=self.delivery_crew, total=Decimal('5.00'), date=timezone.now().date())
+        for user, order_ids in [
+            (self.manager, {self.order.id, other_order.id}),
+            (self.delivery_crew, {other_order.id}),
+            (self.customer, {self.order.id}),
+        ]:
+            with self.subTest(user=user.username):
+                response = self.request(user, 'get', '/api/orders/')
+                self.assertEqual({order['id'] for order in response.data['results']}, order_ids)
+
+class MenuItemETagTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(title='Mains', slug='mains')
+        self.menuitem = MenuItem.objects.create(title='Pasta', price=Decimal('7.50'), featured=False, inventory=10, category=self.category)
+        MenuItem.objects.create(title='Soup', price=Decimal('4.00'), featured=False, inventory=10, category=self.category)
+        self.client = APIClient()
+
+    def test_unchanged_menu_returns_304(self):
+        response = self.client.get('/api/menu-items/')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('updated_at', response.data['results'][0])
+        response = self.client.get('/api/menu-items/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_etag_is_quoted_token(self):
+        response = self.client.get('/api/menu-items/')
+        self.assertRegex(response['ETag'], r'^"[0-9a-f]{32}"$')
+        self.assertIn('Accept', response['Vary'])
+
+    def test_etag_differs_per_media_type(self):
+        json_etag = self.client.get('/api/menu-items/', HTTP_ACCEPT='application/json')['ETag']
+        indented_response = self.client.get('/api/menu-items/', HTTP_ACCEPT='application/json; indent=4', HTTP_IF_NONE_MATCH=json_etag)
+        self.assertEqual(indented_response.status_code, 200)
+        self.assertNotEqual(indented_response['ETag'], json_etag)
+
+    def test_edit_changes_etag(self):
+        etag = self.client.get('/api/menu-items/')['ETag']
+        self.menuitem.price = Decimal('8.00')
+        self.menuitem.save()
+        response = self.client.get('/api/menu-items/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_delete_changes_etag(self):
+        etag = self.client.get('/api/menu-items/')['ETag']
+        self.menuitem.delete()
+        response = self.client.get('/api/menu-items/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+class OrderCreateTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.customer = User.objects.create_user('customer')
+        category = Category.objects.create(title='Mains', slug='mains')
+        self.pasta = MenuItem.objects.create(title='Pasta', price=Decimal('7.50'), featured=False, inventory=10, category=category)
+        self.soup = MenuItem.objects.create(title='Soup', price=Decimal('4.00'), featured=False, inventory=10, category=category)
+        self.client = APIClient()
+        self.client.force_authenticate(self.customer)
+
+    def test_order_created_from_cart(self):
+        Cart.objects.create(user=self.customer, menuitem=self.pasta, quantity=2, unit_price=Decimal('7.50'), price=Decimal('15.00'))
+        Cart.objects.create(user=self.customer, menuitem=self.soup, quantity=1, unit_price=Decimal('4.00'), price=Decimal('4.00'))
+        response = self.client.post('/api/orders/', {}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['total'], '19.00')
+        self.assertEqual(len(response.data['orderitem_set']), 2)
+        self.assertFalse(Cart.objects.filter(user=self.customer).exists())
+
+    def test_only_ordered_cart_rows_are_cleared(self):
+        Cart.objects.create(user=self.customer, menuitem=self.pasta, quantity=1, unit_price=Decimal('7.50'), price=Decimal('7.50'))
+        original_bulk_create = OrderItem.objects.bulk_create
+
+        # Simulate an item added to the cart after the cart rows were read
+        def bulk_create_then_add_to_cart(*args, **kwargs):
+            created = original_bulk_create(*args, **kwargs)
+            Cart.objects.create(user=self.customer, menuitem=self.soup, quantity=1, unit_price=Decimal('4.00'), price=Decimal('4.00'))
+            return created
+
+        with mock.patch.object(OrderItem.objects, 'bulk_create', side_effect=bulk_create_then_add_to_cart):
+            response = self.client.post('/api/orders/', {}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(list(Cart.objects.filter(user=self.customer).values_list('menuitem', flat=True)), [self.soup.id])
@@ -1,21 +1,47 @@
+import hashlib
+from decimal import Decimal
+from functools import lru_cache
 from rest_framework import viewsets, permissions, status
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.contrib.auth.models import User, Group
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
+from django.http import Http404
+from django.db.models import Count, Max
 from .models import Cart, Category, MenuItem, Order, OrderItem
 from .serializers import CartSerializer, CategorySerializer, MenuItemSerializer, OrderSerializer
-from .permissions import IsAdminOrManager, IsAuthenticated, IsCustomer, IsDeliveryCrew, IsManager
+from .permissions import IsAdminOrManager, IsAuthenticated, IsCustomer, IsDeliveryCrew, IsManager, get_user_groups
 from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import etag
+from django.views.decorators.vary import vary_on_headers
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
+# Builds the ETag function for a read endpoint: the row count and latest
+# updated_at change whenever a row is added, edited or deleted, so clients
+# revalidating with If-None-Match get a 304 without re-serializing. The
+# negotiated media type is mixed in so JSON and browsable API responses
+# never share a tag.
+def table_etag(model):
+    def get_etag(request, *args, **kwargs):
+        stats = model.objects.aggregate(count=Count('id'), updated=Max('updated_at'))
+        updated = stats['updated'].isoformat() if stats['updated'] else ''
+        media_type = getattr(request, 'accepted_media_type', '')
+        key = f"{stats['count']}-{updated}-{media_type}"
+        return hashlib.md5(key.encode()).hexdigest()
+    return get_etag
+
 # CategoryViewSet:
 #   - CRUD operations for menu categories.
 #   - Only Admins/Managers can access.
-#   - GET lists all categories.
+#   - GET lists all categories (cached for 60s, ETag revalidation).
 #   - POST creates a new category.
 #   - PUT/PATCH updates an existing category.
 #   - DELETE removes a category.
+@method_decorator([cache_control(max_age=60, private=True), vary_on_headers('Accept'), etag(table_etag(Category))], name='list')
+@method_decorator([cache_control(max_age=60, private=True), vary_on_headers('Accept'), etag(table_etag(Category))], name='retrieve')
 class CategoryViewSet(viewsets.ModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
@@ -24,10 +50,12 @@ class CategoryViewSet(viewsets.ModelViewSet):
 #   - CRUD operations for menu items.
 #   - Filtering, searching, and ordering supported.
 #   - Only Admins/Managers can modify; anyone can view.
-#   - GET lists all menu items.
+#   - GET lists all menu items (cached for 60s, ETag revalidation).
 #   - POST creates a new menu item.
 #   - PUT/PATCH updates an existing menu item.
 #   - DELETE removes a menu item.
+@method_decorator([cache_control(max_age=60), vary_on_headers('Accept'), etag(table_etag(MenuItem))], name='list')
+@method_decorator([cache_control(max_age=60), vary_on_headers('Accept'), etag(table_etag(MenuItem))], name='retrieve')
 class MenuItemViewSet(viewsets.ModelViewSet):
     queryset = MenuItem.objects.all()
     serializer_class = MenuItemSerializer
@@ -44,33 +72,36 @@ class MenuItemViewSet(viewsets.ModelViewSet):
 # CartViewSet:
 #   - View, add, and clear cart items for authenticated customers.
 #   - Permissions: IsAuthenticated and IsCustomer.
-#   - GET lists cart items.
+#   - GET lists cart items (paginated).
 #   - POST adds a menu item to the cart with quantity and calculates price.
 #   - DELETE clears the cart.
 class CartViewSet(viewsets.ViewSet):
     permission_classes = [permissions.IsAuthenticated, IsCustomer]
 
     def list(self, request):
-        cart_items = Cart.objects.filter(user=request.user)
-        serializer = CartSerializer(cart_items, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        cart_items = Cart.objects.filter(user=request.user).order_by('id')
+        paginator = PageNumberPagination()
+        page = paginator.paginate_queryset(cart_items, request, view=self)
+        serializer = CartSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
     def create(self, request):
         menu_item_id = request.data.get("menuitem")
         quantity = int(request.data.get("quantity", 1))
 
-        try:
-            item = MenuItem.objects.get(id=menu_item_id)
-        except MenuItem.DoesNotExist:
+        # Only the id and price are needed, so skip loading the whole menu item
+        item = MenuItem.objects.filter(id=menu_item_id).values('id', 'price').first()
+        if item is None:
             return Response({"detail": "Menu item not found"}, status=404)
 
-        price = quantity * item.price
+        unit_price = item['price']
+        price = quantity * unit_price
 
         cart_item = Cart.objects.create(
             user=request.user,
-            menuitem=item,
+            menuitem_id=item['id'],
             quantity=quantity,
-            unit_price=item.price,
+            unit_price=unit_price,
             price=price
         )
         serializer = CartSerializer(cart_item)
@@ -79,6 +110,24 @@ class CartViewSet(viewsets.ViewSet):
     def destroy(self, request, pk=None):
         Cart.objects.filter(user=request.user).delete()
         return Response({"detail": "Cart cleared"}, status=status.HTTP_200_OK)
+# Permission classes per (HTTP method, user role); role is None for customers
+# and anonymous users, so customer entries must also require authentication.
+ORDER_PERMISSIONS = {
+    ('GET', 'Manager'): [permissions.IsAuthenticated],
+    ('GET', 'Delivery crew'): [IsDeliveryCrew],
+    ('GET', None): [permissions.IsAuthenticated, IsCustomer],
+    ('PATCH', 'Manager'): [permissions.IsAuthenticated],
+    ('PATCH', 'Delivery crew'): [IsDeliveryCrew],
+    ('POST', 'Manager'): [permissions.IsAuthenticated],
+    ('POST', 'Delivery crew'): [IsCustomer],
+    ('POST', None): [permissions.IsAuthenticated, IsCustomer],
+    ('PUT', 'Manager'): [IsManager],
+    ('PUT', 'Delivery crew'): [IsManager],
+    ('PUT', None): [IsManager],
+    ('DELETE', 'Manager'): [IsManager],
+    ('DELETE', 'Delivery crew'): [IsManager],
+    ('DELETE', None): [IsManager],
+}
 # OrderViewSet:
 #   - CRUD operations for orders.
 #   - Permissions and queryset filtered by user group:
@@ -103,66 +152,67 @@ class OrderViewSet(viewsets.ModelViewSet):
     ordering_fields = ['date', 'total', 'status']
 
     def get_permissions(self):
-        if self.request.method in ['PUT', 'DELETE']:
-            return [IsManager()]
-        elif self.request.method == 'GET':
-            if self.request.user.groups.filter(name='Manager').exists():
-                return [permissions.IsAuthenticated()]
-            elif self.request.user.groups.filter(name='Delivery crew').exists():
-                return [IsDeliveryCrew()]
-            else:
-                return [IsCustomer()]
-        elif self.request.method == 'PATCH':
-            if self.request.user.groups.filter(name='Manager').exists():
-                return [permissions.IsAuthenticated()]
-            elif self.request.user.groups.filter(name='Delivery crew').exists():
-                return [IsDeliveryCrew()]
-        elif self.request.method == 'POST':
-            if self.request.user.groups.filter(name='Manager').exists():
-                return [permissions.IsAuthenticated()]
-            else:
-                return [IsCustomer()]
-        return [permissions.IsAuthenticated()]
+        groups = get_user_groups(self.request.user)
+        if 'Manager' in groups:
+            role = 'Manager'
+        elif 'Delivery crew' in groups:
+            role = 'Delivery crew'
+        else:
+            role = None
+        permission_classes = ORDER_PERMISSIONS.get((self.request.method, role), [permissions.IsAuthenticated])
+        return [permission() for permission in permission_classes]
 
     def get_queryset(self):
         user = self.request.user
-        if user.groups.filter(name='Manager').exists():
-            return Order.objects.all()
-        elif user.groups.filter(name='Delivery crew').exists():
-            return Order.objects.filter(delivery_crew=user)
+        # Group names were already loaded by get_permissions for this request
+        groups = get_user_groups(user)
+        if 'Manager' in groups:
+            queryset = Order.objects.all()
+        elif 'Delivery crew' in groups:
+            queryset = Order.objects.filter(delivery_crew=user)
         else:
-            return Order.objects.filter(user=user)
+            queryset = Order.objects.filter(user=user)
+        # Load every order's items in one query instead of one per order
+        return queryset.prefetch_related('orderitem_set')
 
     def create(self, request):
-        cart_items = Cart.objects.filter(user=request.user)
-        if not cart_items.exists():
-            return Response({"detail": "Cart is empty"}, status=400)
+        with transaction.atomic():
+            # Lock the cart rows once and reuse them for the checks and inserts below
+            cart_items = list(Cart.objects.select_for_update().filter(user=request.user))
+            if not cart_items:
+                return Response({"detail": "Cart is empty"}, status=400)
 
-        total = sum(item.price for item in cart_items)
-        order = Order.objects.create(user=request.user, total=total, date=timezone.now().date())
+            total = sum((item.price for item in cart_items), Decimal('0'))
+            order = Order.objects.create(user=request.user, total=total, date=timezone.now().date())
 
-        for item in cart_items:
-            OrderItem.objects.create(
-                order=order,
-                menuitem=item.menuitem,
-                quantity=item.quantity,
-                unit_price=item.unit_price,
-                price=item.price
-            )
+            OrderItem.objects.bulk_create([
+                OrderItem(
+                    order=order,
+                    menuitem_id=item.menuitem_id,
+                    quantity=item.quantity,
+                    unit_price=item.unit_price,
+                    price=item.price
+                )
+                for item in cart_items
+            ], batch_size=500)
 
-        cart_items.delete()
+            # Only clear the rows that were locked and ordered; items added since stay in the cart
+            Cart.objects.filter(pk__in=[item.pk for item in cart_items]).delete()
 
         serializer = OrderSerializer(order)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+    @transaction.atomic
     def partial_update(self, request, pk=None):
         try:
-            order = Order.objects.get(pk=pk)
+            # Scoped like the list: delivery crew can only reach their assigned orders
+            order = self.get_queryset().prefetch_related(None).select_for_update().get(pk=pk)
         except Order.DoesNotExist:
             return Response({"detail": "Order not found"}, status=404)
 
         user = request.user
-        if user.groups.filter(name='Manager').exists():
+        groups = get_user_groups(user)
+        if 'Manager' in groups:
             delivery_crew_id = request.data.get('delivery_crew')
             status_value = request.data.get('status')
             if delivery_crew_id:
@@ -176,7 +226,7 @@ class OrderViewSet(viewsets.ModelViewSet):
             order.save()
             return Response({"detail": "Order updated"}, status=200)
 
-        elif user.groups.filter(name='Delivery crew').exists():
+        elif 'Delivery crew' in groups:
             if 'status' in request.data:
                 order.status = bool(request.data['status'])
                 order.save()
@@ -187,80 +237,83 @@ class OrderViewSet(viewsets.ModelViewSet):
 
 
 # Utility function
-def get_group(name):
-    return Group.objects.get(name=name)
+# Group ids never change at runtime, so look each one up once per process.
+@lru_cache(maxsize=None)
+def _group_id(name):
+    return Group.objects.values_list('id', flat=True).get(name=name)
 
-# ManagerGroupView / ManagerGroupDetailView:
-#   - GET: List users in Manager group.
-#   - POST: Add user to Manager group.
-#   - DELETE: Remove user from Manager group.
-#
-# /api/groups/manager/users
-class ManagerGroupView(APIView):
-    permission_classes = [permissions.IsAuthenticated, IsAdminOrManager]
+# Adds many users to a group with a single INSERT on the membership table.
+# Unknown ids are skipped and existing memberships are left untouched.
+# Returns the ids of the users that exist.
+def add_users_to_group(user_ids, name):
+    through = User.groups.through
+    group_id = _group_id(name)
+    existing_ids = list(User.objects.filter(pk__in=user_ids).values_list('id', flat=True))
+    through.objects.bulk_create(
+        [through(user_id=user_id, group_id=group_id) for user_id in existing_ids],
+        ignore_conflicts=True
+    )
+    return existing_ids
 
-    def get(self, request):
-        group = get_group("Manager")
-        users = group.user_set.all()
-        data = [{"id": u.id, "username": u.username} for u in users]
-        return Response(data)
+# Maps the URL slug of each managed group to its name.
+GROUP_SLUG_MAP = {
+    'manager': 'Manager',
+    'delivery-crew': 'Delivery crew',
+}
 
-    def post(self, request):
-        user_id = request.data.get("user_id")
-        try:
-            user = User.objects.get(pk=user_id)
-            group = get_group("Manager")
-            group.user_set.add(user)
-            return Response({"message": "User added to Manager group"}, status=201)
-        except User.DoesNotExist:
-            return Response({"error": "User not found"}, status=404)
-# /api/groups/manager/users/{userId}
-class ManagerGroupDetailView(APIView):
-    permission_classes = [permissions.IsAuthenticated, IsAdminOrManager]
+def get_group_name(group_slug):
+    try:
+        return GROUP_SLUG_MAP[group_slug]
+    except KeyError:
+        raise Http404
 
-    def delete(self, request, userId):
-        try:
-            user = User.objects.get(pk=userId)
-            group = get_group("Manager")
-            group.user_set.remove(user)
-            return Response({"message": "User removed from Manager group"}, status=200)
-        except User.DoesNotExist:
-            return Response({"error": "User not found"}, status=404)
-
-# DeliveryCrewGroupView / DeliveryCrewGroupDetailView:
-#   - GET: List users in Delivery crew group.
-#   - POST: Add user to Delivery crew group.
-#   - DELETE: Remove user from Delivery crew group.
+# GroupMembershipView / GroupMembershipDetailView:
+#   - GET: List users in the group.
+#   - POST: Add user to the group (or several via user_ids).
+#   - DELETE: Remove user from the group.
 #
-# /api/groups/delivery-crew/users
-class DeliveryCrewGroupView(APIView):
+# /api/groups/{manager|delivery-crew}/users
+class GroupMembershipView(APIView):
     permission_classes = [permissions.IsAuthenticated, IsAdminOrManager]
 
-    def get(self, request):
-        group = get_group("Delivery crew")
-        users = group.user_set.all()
-        data = [{"id": u.id, "username": u.username} for u in users]
+    def get(self, request, group_slug):
+        group_name = get_group_name(group_slug)
+        data = list(User.objects.filter(groups=_group_id(group_name)).values("id", "username"))
         return Response(data)
 
-    def post(self, request):
+    def post(self, request, group_slug):
+        group_name = get_group_name(group_slug)
+        user_ids = request.data.get("user_ids")
+        if user_ids is not None:
+            if not isinstance(user_ids, list) or not user_ids or not all(
+                isinstance(user_id, int) and not isinstance(user_id, bool) for user_id in user_ids
+            ):
+                return Response({"error": "user_ids must be a non-empty list of integers"}, status=400)
+            # Drop repeated ids, keeping the order they were sent in
+            user_ids = list(dict.fromkeys(user_ids))
+            added_ids = set(add_users_to_group(user_ids, group_name))
+            skipped_ids = [user_id for user_id in user_ids if user_id not in added_ids]
+            if not added_ids:
+                return Response({"error": "User not found", "skipped": skipped_ids}, status=404)
+            return Response({"message": f"Users added to {group_name} group", "skipped": skipped_ids}, status=201)
+
         user_id = request.data.get("user_id")
         try:
             user = User.objects.get(pk=user_id)
-            group = get_group("Delivery crew")
-            group.user_set.add(user)
-            return Response({"message": "User added to Delivery crew group"}, status=201)
+            user.groups.add(_group_id(group_name))
+            return Response({"message": f"User added to {group_name} group"}, status=201)
         except User.DoesNotExist:
             return Response({"error": "User not found"}, status=404)
 
-# /api/groups/delivery-crew/users/{userId}
-class DeliveryCrewGroupDetailView(APIView):
+# /api/groups/{manager|delivery-crew}/users/{userId}
+class GroupMembershipDetailView(APIView):
     permission_classes = [permissions.IsAuthenticated, IsAdminOrManager]
 
-    def delete(self, request, userId):
+    def delete(self, request, group_slug, userId):
+        group_name = get_group_name(group_slug)
         try:
             user = User.objects.get(pk=userId)
-            group = get_group("Delivery crew")
-            group.user_set.remove(user)
-            return Response({"message": "User removed from Delivery crew group"}, status=200)
+            user.groups.remove(_group_id(group_name))
+            return Response({"message": f"User removed from {group_name} group"}, status=200)
         except User.DoesNotExist:
-            return Response({"error": "User not found"}, status=404)
\ No newline at end of file
+            return Response({"error": "User not found"}, status=404)
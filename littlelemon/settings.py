@@ -149,8 +149,12 @@ REST_FRAMEWORK = {
         'user': '10/minute',       # Authenticated users: 10 requests per minute
         'anon': '8/minute',        # Unauthenticated users: 8 requests per minute
     },
+    # The browsable API is only useful while developing
+    'DEFAULT_RENDERER_CLASSES': [
+        'rest_framework.renderers.JSONRenderer',
+    ] + (['rest_framework.renderers.BrowsableAPIRenderer'] if DEBUG else []),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 2,  # or any number of items per page
+    'PAGE_SIZE': 50,  # or any number of items per page
 }
 
 